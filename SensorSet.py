@@ -5,6 +5,9 @@ import time
 import pysoem
 from collections import namedtuple
 
+_U8 = struct.Struct('<B')
+_U16 = struct.Struct('<H')
+
 class BOTA_ETH:
     BOTA_VENDOR_ID = 0xB07A
     BOTA_PRODUCT_CODE = 0x00000001
@@ -18,43 +21,56 @@ class BOTA_ETH:
     IMU_ACTIVE = 0
     # ==================================
 
+    STATE_TIMEOUT_US = 500000   # max wait for an EtherCAT state transition
+
     def __init__(self, ifname):
         self._master = pysoem.Master()
         self._ifname = ifname
 
+    def set_state(self, state):
+        self._master.state = state
+        self._master.write_state()
+        # state_check polls the slaves and returns as soon as they report the state
+        if self._master.state_check(state, self.STATE_TIMEOUT_US) != state:
+            print(f"Warning: slaves did not reach state 0x{state:02X}")
+
+    def filter_registers(self):
+        # (index, subindex, payload) for every register written by configure_filters
+        return (
+            # Calibration & flags
+            (0x8010, 1, _U8.pack(1)),
+            (0x8010, 2, _U8.pack(self.TEMPCOMP)),
+            (0x8010, 3, _U8.pack(self.IMU_ACTIVE)),
+
+            # Filtering registers
+            (0x8006, 1, _U16.pack(self.SINC_LENGTH)),
+            (0x8006, 2, _U8.pack(int(not self.FIR))),
+            (0x8006, 3, _U8.pack(int(self.FAST))),
+            (0x8006, 4, _U8.pack(int(self.CHOP))),
+        )
+
     def configure_filters(self, slave):
+        registers = self.filter_registers()
 
         print("\n--- Switching to SAFE_OP ---")
-        self._master.state = pysoem.SAFEOP_STATE
-        self._master.write_state()
-        time.sleep(0.1)
+        self.set_state(pysoem.SAFEOP_STATE)
 
         print("Writing filter registers...")
 
-        # Calibration & flags
-        slave.sdo_write(0x8010, 1, struct.pack('<B', 1))
-        slave.sdo_write(0x8010, 2, struct.pack('<B', self.TEMPCOMP))
-        slave.sdo_write(0x8010, 3, struct.pack('<B', self.IMU_ACTIVE))
-
-        # Filtering registers
-        slave.sdo_write(0x8006, 1, struct.pack('<H', self.SINC_LENGTH))
-        slave.sdo_write(0x8006, 2, struct.pack('<B', int(not self.FIR)))
-        slave.sdo_write(0x8006, 3, struct.pack('<B', int(self.FAST)))
-        slave.sdo_write(0x8006, 4, struct.pack('<B', int(self.CHOP)))
+        for index, subindex, payload in registers:
+            slave.sdo_write(index, subindex, payload)
 
         time.sleep(0.1)
 
         print("--- Switching back to OP ---")
-        self._master.state = pysoem.OP_STATE
-        self._master.write_state()
-        time.sleep(0.2)
+        self.set_state(pysoem.OP_STATE)
 
         # Confirm written configuration
-        sampling_rate = struct.unpack('<H', slave.sdo_read(0x8011, 0))[0]
-        sinc = struct.unpack('<H', slave.sdo_read(0x8006, 1))[0]
-        fir_bit = struct.unpack('<B', slave.sdo_read(0x8006, 2))[0]
-        fast = struct.unpack('<B', slave.sdo_read(0x8006, 3))[0]
-        chop = struct.unpack('<B', slave.sdo_read(0x8006, 4))[0]
+        sampling_rate = _U16.unpack(slave.sdo_read(0x8011, 0))[0]
+        sinc = _U16.unpack(slave.sdo_read(0x8006, 1))[0]
+        fir_bit = _U8.unpack(slave.sdo_read(0x8006, 2))[0]
+        fast = _U8.unpack(slave.sdo_read(0x8006, 3))[0]
+        chop = _U8.unpack(slave.sdo_read(0x8006, 4))[0]
 
         print("\n========== BOTA Filter Config ==========")
         print(f"SINC Length  : {sinc}")